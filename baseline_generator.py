@@ -1,17 +1,43 @@
 import os
+import json
 import yaml
 import logging
 from scraper import scrape_stigs
+from comparator import clear_baseline_cache
+
+try:
+    from yaml import CSafeDumper as _DUMPER
+except ImportError:
+    from yaml import SafeDumper as _DUMPER
 
 # === Baseline Generator ===
 
+def save_baseline(baseline_data: dict, output_path: str):
+    """
+    Writes baseline data to disk. Paths ending in '.json' are written as compact
+    JSON; anything else is written as YAML for hand editing.
+
+    Args:
+        baseline_data (dict): Product -> {Version, Release, URL} mapping
+        output_path (str): Destination file path
+    """
+    try:
+        with open(output_path, 'w') as f:
+            if output_path.endswith('.json'):
+                json.dump(baseline_data, f, sort_keys=True, separators=(',', ':'))
+            else:
+                yaml.dump(baseline_data, f, Dumper=_DUMPER, sort_keys=True)
+    finally:
+        # Resets rewrite the file at the same size, which mtime alone may not reveal
+        clear_baseline_cache()
+
 def generate_baseline(scraped_items: list, output_path: str):
     """
-    Generates a baseline YAML file from scraped items.
+    Generates a baseline file from scraped items.
 
     Args:
         scraped_items (list): List of dicts from scraper
-        output_path (str): Path to save the generated YAML
+        output_path (str): Path to save the generated baseline (.yaml or .json)
     """
     baseline_data = {}
 
@@ -34,11 +60,10 @@ def generate_baseline(scraped_items: list, output_path: str):
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
     try:
-        with open(output_path, 'w') as f:
-            yaml.dump(baseline_data, f, sort_keys=True)
+        save_baseline(baseline_data, output_path)
         logging.info(f"Baseline successfully written to {output_path}")
     except Exception as e:
-        logging.error(f"Failed to write baseline YAML: {str(e)}")
+        logging.error(f"Failed to write baseline: {str(e)}")
 
 # === CLI Interface (optional) ===
 
@@ -4,10 +4,24 @@ generate_cklb.py: Convert an XCCDF STIG XML into a CKLB JSON file for eMASS inge
 """
 import argparse
 import os
-import uuid
+import sys
+import shutil
+import tempfile
 import json
 from datetime import datetime, timezone
-import xml.etree.ElementTree as ET
+
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _HAVE_LXML = False
+else:
+    _HAVE_LXML = True
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 try:
     import jsonschema
@@ -17,116 +31,217 @@ except ImportError:
 # Namespace mapping for XCCDF 1.1
 NS = {'xccdf': 'http://checklists.nist.gov/xccdf/1.1'}
 
+_XCCDF = '{%s}' % NS['xccdf']
+
+def _xpath(path):
+    """Compile a namespaced child path once: an lxml XPath, or a findall without lxml."""
+    if _HAVE_LXML:
+        return ET.XPath(path, namespaces=NS)
+    # Clark notation lets ElementTree skip resolving prefixes through NS on every call
+    path = path.replace('xccdf:', _XCCDF)
+    return lambda elem: elem.findall(path)
+
+def _first(xpath, elem):
+    found = xpath(elem)
+    return found[0] if found else None
+
+# Lookups used per Benchmark / Group / Rule, compiled at import
+_TITLE = _xpath('xccdf:title')
+_VERSION = _xpath('xccdf:version')
+_DESCRIPTION = _xpath('xccdf:description')
+_RELEASE_INFO = _xpath("xccdf:plain-text[@id='release-info']")
+_GROUPS = _xpath('xccdf:Group')
+_RULE = _xpath('xccdf:Rule')
+# Fix text may be nested under <fix> or sit directly on the Rule; the nested form wins.
+# Two queries rather than a union, which would return whichever comes first in the document
+_FIXTEXT_NESTED = _xpath('xccdf:fix/xccdf:fixtext')
+_FIXTEXT_FLAT = _xpath('xccdf:fixtext')
+_FIXTEXT = lambda elem: _FIXTEXT_NESTED(elem) or _FIXTEXT_FLAT(elem)
+# Everything inside the Rule's first <check>, sorted out by tag
+_CHECK_PARTS = _xpath('xccdf:check[1]/*')
+_CHECK_CONTENT_TAG = _XCCDF + 'check-content'
+_CHECK_CONTENT_REF_TAG = _XCCDF + 'check-content-ref'
+if _HAVE_LXML:
+    # Plain strings straight from C; smart strings would keep each dropped Group alive
+    _CCIS = ET.XPath("xccdf:ident[@system='http://cyber.mil/cci']/text()", namespaces=NS, smart_strings=False)
+else:
+    _CCI_IDENTS = _xpath("xccdf:ident[@system='http://cyber.mil/cci']")
+    _CCIS = lambda elem: [ident.text for ident in _CCI_IDENTS(elem)]
+# (output key, element name) for each section embedded in a Rule's description
+_DESC_SECTIONS = (
+    ('discussion', 'VulnDiscussion'),
+    ('false_positives', 'FalsePositives'),
+    ('false_negatives', 'FalseNegatives'),
+    ('documentable', 'Documentable'),
+    ('security_override_guidance', 'SeverityOverrideGuidance'),
+    ('potential_impacts', 'PotentialImpacts'),
+    ('third_party_tools', 'ThirdPartyTools'),
+    ('mitigations', 'Mitigations'),
+    ('mitigation_control', 'MitigationControl'),
+    ('responsibility', 'Responsibility'),
+    ('ia_controls', 'IAControls'),
+)
+_DESC_KEYS = {_XCCDF + sec: key for key, sec in _DESC_SECTIONS}
+
+# Every rule has the same keys in the same order; constant fields are filled in here and
+# description sections default to "". Mutable values are replaced per rule.
+_RULE_TEMPLATE = dict.fromkeys([
+    "evaluate-stig", "group_id_src", "group_tree", "group_id", "group_title", "severity",
+    "rule_id_src", "rule_id", "rule_version", "rule_title", "fix_text", "weight",
+    "check_content", "check_content_ref", "classification",
+    *(key for key, _ in _DESC_SECTIONS),
+    "legacy_ids", "ccis", "reference_identifier", "uuid", "stig_uuid", "status",
+    "overrides", "comments", "finding_details"])
+_RULE_TEMPLATE.update({key: "" for key, _ in _DESC_SECTIONS})
+_RULE_TEMPLATE.update(classification="UNCLASSIFIED", status="not_reviewed", comments="", finding_details="")
+
+UUID_BATCH = 256  # random UUIDs drawn from one os.urandom call
+
+def _uuid4_strings(batch=UUID_BATCH):
+    """Yield random (version 4) UUID strings, formatted straight from hex without building UUID objects."""
+    while True:
+        raw = bytearray(os.urandom(16 * batch))
+        # Stamp the version and RFC 4122 variant bits into every 16-byte block
+        raw[6::16] = bytes((b & 0x0F) | 0x40 for b in raw[6::16])
+        raw[8::16] = bytes((b & 0x3F) | 0x80 for b in raw[8::16])
+        h = raw.hex()
+        for i in range(0, len(h), 32):
+            yield f'{h[i:i+8]}-{h[i+8:i+12]}-{h[i+12:i+16]}-{h[i+16:i+20]}-{h[i+20:i+32]}'
+
+READ_BUFFER = 1 << 20  # bytes per read from the XCCDF file, instead of the default 8 KiB
+# lxml only: never expand entities from a DTD (lxml < 5 loads external ones by default),
+# skip the xml:id index (ids aren't looked up) and drop whitespace-only tails between
+# elements, none of which reach the checklist
+_ITERPARSE_OPTIONS = dict(resolve_entities=False, collect_ids=False, remove_blank_text=True) if _HAVE_LXML else {}
+# What lxml raises when a document goes past libxml2's size and depth limits
+_XML_SYNTAX_ERROR = ET.XMLSyntaxError if _HAVE_LXML else ()
+
+# Clark-notation tags of the Benchmark children read while streaming
+_GROUP_TAG = _XCCDF + 'Group'
+_TITLE_TAG = _XCCDF + 'title'
+_VERSION_TAG = _XCCDF + 'version'
+_PLAIN_TEXT_TAG = _XCCDF + 'plain-text'
+_HEADER_TAGS = (_TITLE_TAG, _VERSION_TAG, _PLAIN_TEXT_TAG)
+_BENCHMARK_TAG = _XCCDF + 'Benchmark'
+_STREAM_TAGS = (_BENCHMARK_TAG, _GROUP_TAG) + _HEADER_TAGS
+
 def parse_benchmark(tree):
 
     root = tree.getroot()
-    stig_name = root.find('xccdf:title', NS).text or ""
+    stig_name = _first(_TITLE, root).text or ""
     stig_id = root.get('id') or ""
-    release_info = root.find("xccdf:plain-text[@id='release-info']", NS).text or ""
-    stig_version = root.find('xccdf:version', NS).text or ""
+    release_info = _first(_RELEASE_INFO, root).text or ""
+    stig_version = _first(_VERSION, root).text or ""
     return stig_name, stig_id, release_info, stig_version
 
-def parse_rules(tree, input_file, stig_uuid):
+def _answer_file_stamp(input_file):
+    """Return the (answer_file, last_write) pair shared by every rule from input_file."""
+    mtime = datetime.fromtimestamp(os.stat(input_file).st_mtime, timezone.utc).isoformat()
+    return sys.intern(os.path.basename(input_file)), sys.intern(mtime + 'Z')
+
+def _rule_from_group(grp, answer_file, last_write, stig_uuid, new_uuid):
+    """Build the CKLB rule dict for one XCCDF Group, or None if it has no Rule."""
+    rule_elem = _first(_RULE, grp)
+    if rule_elem is None:
+        return None
+    gid_src = grp.get('id') or ""
+    rid_src = rule_elem.get('id') or ""
+    pretty_rid = rid_src.replace('_rule', '')
+
+    # group metadata
+    group_title = _first(_TITLE, grp).text or ""
+    group_desc = _first(_DESCRIPTION, grp).text or ""
+
+    # extract fix text: handle both nested and flat
+    fix_text = ""
+    fix_elem = _first(_FIXTEXT, rule_elem)
+    if fix_elem is not None and fix_elem.text:
+        fix_text = fix_elem.text.strip()
+
+    # check content
+    check_content = ''
+    check_ref = None
+    cc = cr = None
+    for part in _CHECK_PARTS(rule_elem):
+        if part.tag == _CHECK_CONTENT_TAG:
+            if cc is None:
+                cc = part
+        elif part.tag == _CHECK_CONTENT_REF_TAG:
+            if cr is None:
+                cr = part
+    if cc is not None and cc.text:
+        check_content = cc.text.strip()
+    if cr is not None:
+        check_ref = {'href': cr.get('href'), 'name': cr.get('name')}
+
+    # identifiers (CCI)
+    # CCIs, severities and weights repeat across rules; interned, each is stored once
+    ccis = [sys.intern(cci) if cci else cci for cci in _CCIS(rule_elem)]
+    ref_id = ccis[0] if ccis else None
+
+    # assemble rule: copying the pre-shaped template is cheaper than a fresh literal
+    r = _RULE_TEMPLATE.copy()
+    r["evaluate-stig"] = {
+        "answer_file": answer_file,
+        "last_write": last_write,
+        "afmod": False,
+        "old_status": "",
+        "new_status": ""
+    }
+    r["group_id_src"] = gid_src
+    r["group_tree"] = [{"id": gid_src, "title": group_title, "description": group_desc}]
+    r["group_id"] = gid_src
+    r["group_title"] = group_title
+    severity = rule_elem.get('severity')
+    r["severity"] = sys.intern(severity) if severity else severity
+    r["rule_id_src"] = rid_src
+    r["rule_id"] = pretty_rid
+    r["rule_version"] = _first(_VERSION, rule_elem).text or ""
+    r["rule_title"] = _first(_TITLE, rule_elem).text or ""
+    r["fix_text"] = fix_text
+    weight = rule_elem.get('weight')
+    r["weight"] = sys.intern(weight) if weight else weight
+    r["check_content"] = check_content
+    r["check_content_ref"] = check_ref
+
+    # description sections, written straight into the rule: one walk over the
+    # description's children, so absent sections cost nothing
+    desc_elem = _first(_DESCRIPTION, rule_elem)
+    if desc_elem is not None:
+        for node in desc_elem:
+            key = _DESC_KEYS.get(node.tag)
+            if key is not None and node.text and not r[key]:
+                r[key] = node.text
+
+    r["legacy_ids"] = []
+    r["ccis"] = ccis
+    r["reference_identifier"] = ref_id
+    r["uuid"] = new_uuid()
+    r["stig_uuid"] = stig_uuid
+    r["overrides"] = {}
+    return r
+
+def parse_rules(tree, input_file, stig_uuid, new_uuid=None):
+    if new_uuid is None:
+        new_uuid = _uuid4_strings().__next__
     root = tree.getroot()
     rules = []
-    mtime = datetime.fromtimestamp(os.path.getmtime(input_file), timezone.utc).isoformat()
-    for grp in root.findall('xccdf:Group', NS):
-        rule_elem = grp.find('xccdf:Rule', NS)
-        if rule_elem is None:
-            continue
-        gid_src = grp.get('id') or ""
-        rid_src = rule_elem.get('id') or ""
-        pretty_rid = rid_src.replace('_rule', '')
-
-        # group metadata
-        group_title = grp.find('xccdf:title', NS).text or ""
-        group_desc = grp.find('xccdf:description', NS).text or ""
-
-        # description sections
-        desc_elem = rule_elem.find('xccdf:description', NS)
-        desc_data = {}
-        for sec in ['VulnDiscussion','FalsePositives','FalseNegatives','Documentable',
-                    'SeverityOverrideGuidance','PotentialImpacts','ThirdPartyTools',
-                    'Mitigations','MitigationControl','Responsibility','IAControls']:
-            node = desc_elem.find(f'xccdf:{sec}', NS) if desc_elem is not None else None
-            desc_data[sec.lower()] = node.text or "" if node is not None else ""
-
-        # extract fix text: handle both nested and flat
-        fix_text = ""
-        fix_elem = rule_elem.find('xccdf:fix/xccdf:fixtext', NS)
-        if fix_elem is None:
-            fix_elem = rule_elem.find('xccdf:fixtext', NS)
-        if fix_elem is not None and fix_elem.text:
-            fix_text = fix_elem.text.strip()
-
-        # check content
-        check = rule_elem.find('xccdf:check', NS)
-        check_content = ''
-        check_ref = None
-        if check is not None:
-            cc = check.find('xccdf:check-content', NS)
-            if cc is not None and cc.text:
-                check_content = cc.text.strip()
-            cr = check.find('xccdf:check-content-ref', NS)
-            if cr is not None:
-                check_ref = {'href': cr.get('href'), 'name': cr.get('name')}
-
-        # identifiers (CCI)
-        ccis = [ident.text for ident in rule_elem.findall("xccdf:ident[@system='http://cyber.mil/cci']", NS)]
-        ref_id = ccis[0] if ccis else None
-
-        # assemble rule
-        r = {
-            "evaluate-stig": {
-                "answer_file": os.path.basename(input_file),
-                "last_write": mtime + 'Z',
-                "afmod": False,
-                "old_status": "",
-                "new_status": ""
-            },
-            "group_id_src": gid_src,
-            "group_tree": [{"id": gid_src, "title": group_title, "description": group_desc}],
-            "group_id": gid_src,
-            "group_title": group_title,
-            "severity": rule_elem.get('severity'),
-            "rule_id_src": rid_src,
-            "rule_id": pretty_rid,
-            "rule_version": rule_elem.find('xccdf:version', NS).text or "",
-            "rule_title": rule_elem.find('xccdf:title', NS).text or "",
-            "fix_text": fix_text,
-            "weight": rule_elem.get('weight'),
-            "check_content": check_content,
-            "check_content_ref": check_ref,
-            "classification": "UNCLASSIFIED",
-            "discussion": desc_data.get('vulndiscussion',''),
-            "false_positives": desc_data.get('falsepositives',''),
-            "false_negatives": desc_data.get('falsenegatives',''),
-            "documentable": desc_data.get('documentable',''),
-            "security_override_guidance": desc_data.get('severityoverrideguidance',''),
-            "potential_impacts": desc_data.get('potentialimpacts',''),
-            "third_party_tools": desc_data.get('thirdpartytools',''),
-            "mitigations": desc_data.get('mitigations',''),
-            "mitigation_control": desc_data.get('mitigationcontrol',''),
-            "responsibility": desc_data.get('responsibility',''),
-            "ia_controls": desc_data.get('iacontrols',''),
-            "legacy_ids": [],
-            "ccis": ccis,
-            "reference_identifier": ref_id,
-            "uuid": str(uuid.uuid4()),
-            "stig_uuid": stig_uuid,
-            "status": "not_reviewed",
-            "overrides": {},
-            "comments": "",
-            "finding_details": ""
-        }
-        rules.append(r)
+    answer_file, last_write = _answer_file_stamp(input_file)
+    for grp in _GROUPS(root):
+        r = _rule_from_group(grp, answer_file, last_write, stig_uuid, new_uuid)
+        if r is not None:
+            rules.append(r)
 
     return rules
 
 def build_cklb(tree, input_file):
     stig_name, stig_id, release_info, stig_version = parse_benchmark(tree)
-    stig_uuid = str(uuid.uuid4())
-    rules = parse_rules(tree, input_file, stig_uuid)
+    new_uuid = _uuid4_strings().__next__
+    stig_uuid = new_uuid()
+    rules = parse_rules(tree, input_file, stig_uuid, new_uuid)
+    return _assemble_cklb(stig_name, stig_id, release_info, stig_version, stig_uuid, rules, new_uuid())
+
+def _assemble_cklb(stig_name, stig_id, release_info, stig_version, stig_uuid, rules, cklb_uuid):
     ref_id = rules[0]['reference_identifier'] if rules else None
     stig_obj = {
         "evaluate-stig": {"time": datetime.now(timezone.utc).isoformat().replace('+00:00','Z'),
@@ -143,7 +258,7 @@ def build_cklb(tree, input_file):
     }
     cklb = {"evaluate-stig": {"version": "1.0"},
             "title": stig_name,
-            "id": str(uuid.uuid4()),
+            "id": cklb_uuid,
             "stigs": [stig_obj],
             "active": True,
             "mode": 2,
@@ -154,10 +269,168 @@ def build_cklb(tree, input_file):
             "cklb_version": "1.0"}
     return cklb
 
+def _benchmark_children(f, header, huge_tree=False):
+    """Yield direct children of the Benchmark in f as each one closes, then drop it.
+
+    With lxml only Groups and header elements are reported, in C, and the fast_iter
+    idiom clears each one and deletes everything before it. Otherwise every element's
+    start and end is tracked to find the Benchmark's children. Either way the
+    Benchmark's id is stored in header['id'] at the end, if the root is an XCCDF 1.1
+    Benchmark. huge_tree lifts libxml2's size and depth limits; ElementTree has none.
+    """
+    if _HAVE_LXML:
+        for _, elem in ET.iterparse(f, events=('end',), tag=_STREAM_TAGS, huge_tree=huge_tree,
+                                    **_ITERPARSE_OPTIONS):
+            parent = elem.getparent()
+            if parent is None:
+                header['id'] = elem.get('id')
+            elif parent.getparent() is None:
+                yield elem
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del parent[0]
+        return
+
+    root = None
+    depth = 0
+    for event, elem in ET.iterparse(f, events=('start', 'end'), **_ITERPARSE_OPTIONS):
+        if event == 'start':
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1:
+            yield elem
+            root.remove(elem)
+    if root is not None and root.tag == _BENCHMARK_TAG:
+        header['id'] = root.get('id')
+
+def _iter_xccdf_rules(input_file, header, stig_uuid, new_uuid, huge_tree=False):
+    """Stream input_file, yielding each rule as its Group closes and then dropping the Group.
+
+    Only the Benchmark header and the current Group are held as XML. Benchmark header
+    values are collected into header by Clark tag, plus 'id' once the stream is done.
+    Raises ValueError, after the last rule, if input_file is not an XCCDF 1.1 Benchmark
+    with a title.
+    """
+    answer_file, last_write = _answer_file_stamp(input_file)
+    with open(input_file, 'rb', buffering=READ_BUFFER) as f:
+        for elem in _benchmark_children(f, header, huge_tree):
+            tag = elem.tag
+            if tag == _GROUP_TAG:
+                r = _rule_from_group(elem, answer_file, last_write, stig_uuid, new_uuid)
+                if r is not None:
+                    yield r
+            elif tag in _HEADER_TAGS and tag not in header:
+                if tag != _PLAIN_TEXT_TAG:
+                    header[tag] = elem.text
+                elif elem.get('id') == 'release-info':
+                    header[tag] = elem.text
+    if 'id' not in header:
+        raise ValueError(f"{input_file} is not an XCCDF 1.1 Benchmark")
+    if _TITLE_TAG not in header:
+        raise ValueError(f"{input_file}: Benchmark has no title")
+
+def _assemble_streamed(header, stig_uuid, rules, cklb_uuid):
+    return _assemble_cklb(header[_TITLE_TAG] or "", header['id'] or "",
+                          header.get(_PLAIN_TEXT_TAG) or "", header.get(_VERSION_TAG) or "",
+                          stig_uuid, rules, cklb_uuid)
+
+def _with_huge_tree_retry(build, *args):
+    """Return build(*args, huge_tree=False), retrying with huge_tree=True only if lxml
+    stopped at libxml2's size or depth limits.
+
+    The limits guard against hostile documents, so they stay on unless a download
+    actually needs them lifted.
+    """
+    try:
+        return build(*args, huge_tree=False)
+    except _XML_SYNTAX_ERROR as e:
+        # libxml2 words these as "... try XML_PARSE_HUGE" or "huge text node"
+        if 'huge' not in str(e).lower():
+            raise
+    return build(*args, huge_tree=True)
+
 def generate_cklb_json(input_file):
-    tree = ET.parse(input_file)
-    cklb = build_cklb(tree, input_file)
-    return cklb
+    """Build the CKLB dict for input_file in one streaming pass over the XML.
+
+    Peak XML memory is one Group, so it is bounded by the output rather than by the
+    size of the document tree.
+    """
+    return _with_huge_tree_retry(_generate_cklb_json, input_file)
+
+def _generate_cklb_json(input_file, huge_tree):
+    new_uuid = _uuid4_strings().__next__
+    stig_uuid = new_uuid()
+    header = {}
+    rules = list(_iter_xccdf_rules(input_file, header, stig_uuid, new_uuid, huge_tree))
+    return _assemble_streamed(header, stig_uuid, rules, new_uuid())
+
+def stream_cklb_to_file(input_file, output_path):
+    """Write the CKLB for input_file to output_path without holding every rule in memory.
+
+    Each rule is serialized as soon as its Group is parsed and spooled to a temporary
+    file. The checklist is then written around the spooled rules, since its header
+    carries the rule count. Returns the number of rules written.
+    """
+    return _with_huge_tree_retry(_stream_cklb_to_file, input_file, output_path)
+
+def _stream_cklb_to_file(input_file, output_path, huge_tree):
+    new_uuid = _uuid4_strings().__next__
+    stig_uuid = new_uuid()
+    header = {}
+    count = 0
+    ref_id = None
+    with tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(output_path))) as spool:
+        for r in _iter_xccdf_rules(input_file, header, stig_uuid, new_uuid, huge_tree):
+            if count:
+                spool.write(b',\n')
+            else:
+                ref_id = r['reference_identifier']
+            # JSON strings never hold a raw newline, so this only re-indents the layout
+            spool.write(_RULE_INDENT + dump_cklb_bytes(r).replace(b'\n', b'\n' + _RULE_INDENT))
+            count += 1
+
+        cklb = _assemble_streamed(header, stig_uuid, [], new_uuid())
+        cklb['stigs'][0]['size'] = count
+        cklb['stigs'][0]['reference_identifier'] = ref_id
+        head, _, tail = dump_cklb_bytes(cklb).partition(_EMPTY_RULES)
+        spool.seek(0)
+        # Renamed into place once complete, so a failed conversion never leaves a truncated checklist
+        part_path = output_path + '.part'
+        try:
+            with open(part_path, 'wb') as out:
+                out.write(head)
+                if count:
+                    out.write(b'"rules": [\n')
+                    shutil.copyfileobj(spool, out, READ_BUFFER)
+                    out.write(b'\n' + _RULE_INDENT[:-2] + b']')
+                else:
+                    out.write(_EMPTY_RULES)
+                out.write(tail)
+            os.replace(part_path, output_path)
+        except BaseException:
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+            raise
+    return count
+
+# Layout of the rules list in an indent-2 checklist: cklb -> stigs[0] -> rules[i]
+_EMPTY_RULES = b'"rules": []'
+_RULE_INDENT = b' ' * 8
+
+def dump_cklb_bytes(cklb):
+    """Serialize a CKLB dict as indented UTF-8 JSON bytes, with orjson when available."""
+    if orjson:
+        return orjson.dumps(cklb, option=orjson.OPT_INDENT_2)
+    return json.dumps(cklb, indent=2).encode('utf-8')
+
+def generate_cklb_bytes(input_file):
+    """Like generate_cklb_json, but return the serialized file contents for writing to disk."""
+    return dump_cklb_bytes(generate_cklb_json(input_file))
 
 def main():
     parser = argparse.ArgumentParser(description="Generate a CKLB JSON file from an XCCDF STIG XML")
@@ -167,10 +440,7 @@ def main():
     if not os.path.isfile(args.input_xml):
         print(f"Input file not found: {args.input_xml}")
         exit(1)
-    tree = ET.parse(args.input_xml)
-    cklb = build_cklb(tree, args.input_xml)
-    with open(args.output_cklb,'w') as f:
-        json.dump(cklb,f,indent=2)
+    stream_cklb_to_file(args.input_xml, args.output_cklb)
     print(f"Generated CKLB file: {args.output_cklb}")
 
 if __name__ == '__main__':
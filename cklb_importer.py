@@ -1,37 +1,155 @@
 # cklb_importer.py
 
 import os
+import errno
+import stat
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import filedialog, Tk
 import logging
 
-def import_cklb_files(target_dir="cklb_proc/usr_cklb_lib", on_import_complete=None):
-    os.makedirs(target_dir, exist_ok=True)
+MAX_WORKERS = 8  # concurrent imports; beyond this a single disk or share gains nothing
+COPY_CHUNK = 1 << 30  # bytes requested per copy_file_range call
+# copy_file_range errors meaning "not possible here" rather than a real I/O failure
+_COPY_RANGE_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM}
 
-    # Suppress main tkinter window
-    root = Tk()
-    root.withdraw()
+# Withdrawn root reused by file dialogs opened without a parent window
+_hidden_root = None
 
-    # Ask for CKLB files
-    file_paths = filedialog.askopenfilenames(
+# Target directories already created by this process
+_ensured_dirs = set()
+
+def _ensure_dir(path):
+    if path not in _ensured_dirs:
+        os.makedirs(path, exist_ok=True)
+        _ensured_dirs.add(path)
+
+def _existing_entries(target_dir):
+    """Map file names in target_dir to their DirEntry, read with a single scandir."""
+    try:
+        with os.scandir(target_dir) as it:
+            return {entry.name: entry for entry in it}
+    except FileNotFoundError:
+        # Removed since it was first ensured
+        _ensured_dirs.discard(target_dir)
+        _ensure_dir(target_dir)
+        return {}
+
+def _fast_copy(src, dst):
+    """Copy src to dst with its metadata, like shutil.copy2.
+
+    Where available the data moves with os.copy_file_range, so it stays in the kernel
+    (and becomes an O(1) reflink on filesystems such as XFS and Btrfs). Otherwise, or if
+    the kernel refuses, shutil.copyfile is used.
+    """
+    copied = False
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), COPY_CHUNK):
+                    pass
+            copied = True
+        except OSError as e:
+            if e.errno not in _COPY_RANGE_UNSUPPORTED:
+                raise
+    if not copied:
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+def _import_one(path, target_dir, existing):
+    """Validate and copy one selected file, returning its import status."""
+    # The dialog already filters on *.cklb, but import_cklbs also takes paths from code.
+    # Lowercasing only the suffix avoids copying the whole path.
+    if path[-5:].lower() != ".cklb":
+        logging.warning(f"Skipped invalid file: {path}")
+        return "skipped"
+    try:
+        src_stat = os.stat(path)
+        if not stat.S_ISREG(src_stat.st_mode):
+            logging.warning(f"Skipped invalid file: {path}")
+            return "skipped"
+        name = os.path.basename(path)
+        dest = os.path.join(target_dir, name)
+        # The copy preserves mtime, so a matching destination means this file was already imported
+        entry = existing.get(name)
+        if entry is not None:
+            try:
+                dest_stat = entry.stat()
+                if dest_stat.st_mtime_ns == src_stat.st_mtime_ns and dest_stat.st_size == src_stat.st_size:
+                    logging.info(f"Already imported: {dest}")
+                    return "unchanged"
+            except OSError:
+                pass
+        _fast_copy(path, dest)
+    except OSError as e:
+        logging.error(f"Failed to copy {path}: {e}")
+        return "failed"
+    logging.info(f"Imported: {dest}")
+    return "imported"
+
+def iter_import_cklbs(file_paths, target_dir="cklb_proc/usr_cklb_lib"):
+    """Copy CKLB files into target_dir, yielding (path, status) per file.
+
+    status is one of "imported", "unchanged", "skipped" or "failed". Results come in
+    selection order as each file finishes, so callers can report progress during large
+    imports.
+    """
+    _ensure_dir(target_dir)
+    existing = _existing_entries(target_dir)
+    if not file_paths:
+        return
+
+    # Files sharing a name would be copied to the same destination at once. Only the last
+    # one is imported, as it would have overwritten the others anyway.
+    last_by_name = {os.path.basename(path): i for i, path in enumerate(file_paths)}
+
+    # Each file's stat and copy is I/O bound, so whole imports run concurrently
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(last_by_name))) as pool:
+        futures = [pool.submit(_import_one, path, target_dir, existing)
+                   if last_by_name[os.path.basename(path)] == i else None
+                   for i, path in enumerate(file_paths)]
+        for path, future in zip(file_paths, futures):
+            if future is None:
+                kept = file_paths[last_by_name[os.path.basename(path)]]
+                if kept == path:
+                    logging.info(f"Skipped duplicate selection: {path}")
+                else:
+                    logging.warning(f"Skipped {path}: {kept} has the same name and is imported instead")
+                yield path, "skipped"
+            else:
+                yield path, future.result()
+
+def import_cklbs(file_paths, target_dir="cklb_proc/usr_cklb_lib"):
+    """List form of iter_import_cklbs."""
+    return list(iter_import_cklbs(file_paths, target_dir))
+
+def _get_hidden_root():
+    """Return a withdrawn Tk root to own file dialogs, created once per process."""
+    global _hidden_root
+    if _hidden_root is None:
+        _hidden_root = Tk()
+        _hidden_root.withdraw()
+    return _hidden_root
+
+def ask_cklb_files(parent=None):
+    """Ask the user for CKLB files, returning the selected paths (empty if cancelled)."""
+    return filedialog.askopenfilenames(
+        parent=parent or _get_hidden_root(),
         title="Select CKLB Files",
         filetypes=[("CKLB Files", "*.cklb")]
     )
 
+def import_cklb_files(target_dir="cklb_proc/usr_cklb_lib", on_import_complete=None, parent=None):
+    _ensure_dir(target_dir)
+
+    # Ask for CKLB files
+    file_paths = ask_cklb_files(parent)
+
     if not file_paths:
         logging.info("No files selected.")
         return
 
-    for path in file_paths:
-        if not path.lower().endswith(".cklb"):
-            logging.warning(f"Skipped invalid file: {path}")
-            continue
-        try:
-            dest = os.path.join(target_dir, os.path.basename(path))
-            shutil.copy2(path, dest)
-            logging.info(f"Imported: {dest}")
-        except Exception as e:
-            logging.error(f"Failed to copy {path}: {e}")
+    import_cklbs(file_paths, target_dir)
     
     if on_import_complete:
-        on_import_complete()
\ No newline at end of file
+        on_import_complete()
@@ -1,48 +1,100 @@
 import os
+import json
+import functools
 import yaml
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # libyaml's C loader, when PyYAML was built against it
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+def load_baseline(baseline_path: str) -> dict:
+    """
+    Load a baseline file. JSON baselines ('.json') are parsed with orjson when it is
+    installed; anything else is treated as YAML.
+
+    Args:
+        baseline_path (str): Path to baseline YAML or JSON file
+    """
+    if baseline_path.endswith('.json'):
+        with open(baseline_path, 'rb') as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson else json.loads(raw)
+    with open(baseline_path, 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+@functools.lru_cache(maxsize=8)
+def _load_baseline_cached(path, mtime_ns, size):
+    return load_baseline(path)
+
+def clear_baseline_cache():
+    """
+    Drop every cached baseline parse. Call after rewriting a baseline: a rewrite of the
+    same size within one mtime tick would otherwise keep serving the old parse.
+    """
+    _load_baseline_cached.cache_clear()
+
+def load_baseline_cached(baseline_path: str) -> dict:
+    """
+    Like load_baseline, but reuses the previous parse while the file's mtime and size
+    are unchanged. The returned dict is shared between callers and must not be modified.
+
+    Args:
+        baseline_path (str): Path to baseline YAML or JSON file
+    """
+    st = os.stat(baseline_path)
+    return _load_baseline_cached(os.path.realpath(baseline_path), st.st_mtime_ns, st.st_size)
+
 def compare_to_baseline(scraped_items: list, baseline_path: str):
     """
-    Compare scraped STIG items against a baseline YAML file.
+    Compare scraped STIG items against a baseline YAML or JSON file.
 
     Args:
         scraped_items (list): List of dicts from scraper
-        baseline_path (str): Path to baseline YAML file
+        baseline_path (str): Path to baseline YAML or JSON file
+
+    Returns:
+        list: Scraped items whose version or release differs from the baseline,
+        or None if the baseline could not be loaded
     """
     if not os.path.isfile(baseline_path):
-        logging.error(f"Baseline YAML not found: {baseline_path}")
-        return
+        logging.error(f"Baseline not found: {baseline_path}")
+        return None
 
     try:
-        with open(baseline_path, "r") as f:
-            baseline_data = yaml.safe_load(f)
+        baseline_data = load_baseline_cached(baseline_path)
         logging.info("Loaded baseline successfully.")
     except Exception as e:
-        logging.error(f"Failed to load baseline YAML: {str(e)}")
-        return
+        logging.error(f"Failed to load baseline: {str(e)}")
+        return None
 
     scraped_products = {entry['Product'] for entry in scraped_items}
-    differences_found = False  # Track if any differences are found
+    known_products = {product for product, expected in baseline_data.items() if expected}
+    new_products = scraped_products - known_products
+    missing_products = baseline_data.keys() - scraped_products
+    changed_items = []
+
+    if new_products:
+        logging.info("\n".join(f"[NEW] Not in baseline: {product}" for product in sorted(new_products)))
 
     for parsed in scraped_items:
-        product = parsed['Product']
-        version = parsed['Version']
-        release = parsed['Release']
-
-        expected = baseline_data.get(product)
-        if not expected:
-            logging.info(f"[NEW] Not in baseline: {product}")
-            differences_found = True
-        else:
-            if expected['Version'] != version or expected['Release'] != release:
-                logging.info(f"[CHANGE] Version mismatch for {product}: Expected Ver {expected['Version']} Rel {expected['Release']}, Found Ver {version} Rel {release}")
-                differences_found = True
-
-    for product in baseline_data.keys():
-        if product not in scraped_products:
-            logging.info(f"[MISSING] Missing from scrape: {product}")
-            differences_found = True
+        expected = baseline_data.get(parsed['Product'])
+        if expected and (parsed['Version'], parsed['Release']) != (expected['Version'], expected['Release']):
+            logging.info(f"[CHANGE] Version mismatch for {parsed['Product']}: Expected Ver {expected['Version']} Rel {expected['Release']}, Found Ver {parsed['Version']} Rel {parsed['Release']}")
+            changed_items.append(parsed)
 
+    if missing_products:
+        logging.info("\n".join(f"[MISSING] Missing from scrape: {product}" for product in sorted(missing_products)))
+
+    differences_found = bool(new_products or missing_products or changed_items)
     if not differences_found:
-        logging.info("[INFO] Comparison completed — no differences found.")
\ No newline at end of file
+        logging.info("[INFO] Comparison completed — no differences found.")
+
+    return changed_items
@@ -0,0 +1,3 @@
+"""Values shared by modules that should not import each other."""
+
+META_SUFFIX = ".meta.json"  # sidecar holding a downloaded zip's ETag/Last-Modified for revalidation
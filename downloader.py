@@ -1,13 +1,30 @@
 import os
+import json
 import logging
-import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+from constants import META_SUFFIX
+from scraper import SESSION
 
 MAX_RETRIES = 3
 RETRY_DELAY = 5  # seconds
+MAX_WORKERS = 8  # DISA's server throttles clients that open many connections
+CHUNK_SIZE = 1 << 16  # bytes per write; keeps memory flat per worker without tiny writes
+
+def download_updates(changed_items: list, target_dir: str = "cklb_proc/xccdf_lib", on_downloaded=None):
+    """
+    Download the zips for changed items into target_dir.
+
+    Zips already on disk are revalidated with a conditional GET when their sidecar has
+    validators, and skipped outright otherwise.
 
-def download_updates(changed_items: list, target_dir: str = "cklb_proc/xccdf_lib"):
+    If on_downloaded is given it is called with each zip's path as soon as that zip is
+    on disk (including zips that were already there). It runs on the download workers,
+    so processing one zip overlaps the remaining downloads.
+    """
     os.makedirs(target_dir, exist_ok=True)
+    downloads = {}
     for item in changed_items:
         product = item.get("Product")
         url = item.get("URL")
@@ -19,23 +36,87 @@ def download_updates(changed_items: list, target_dir: str = "cklb_proc/xccdf_lib
         filename = os.path.basename(url)
         dest_path = os.path.join(target_dir, filename)
 
-        if os.path.exists(dest_path):
+        if dest_path in downloads:
             logging.info(f"{filename} already exists. Skipping.")
             continue
 
-        for attempt in range(1, MAX_RETRIES + 1):
+        validators = None
+        if os.path.exists(dest_path):
+            validators = _read_meta(dest_path)
+            if not validators:
+                logging.info(f"{filename} already exists. Skipping.")
+                if on_downloaded:
+                    downloads[dest_path] = (product, url, dest_path, False, None)
+                continue
+
+        downloads[dest_path] = (product, url, dest_path, True, validators)
+
+    if not downloads:
+        return
+
+    def run(job):
+        product, url, dest_path, needed, validators = job
+        if (not needed or _download_one(product, url, dest_path, validators)) and on_downloaded:
+            on_downloaded(dest_path)
+
+    # Downloads are network bound, so fetch several at once
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(downloads))) as pool:
+        list(pool.map(run, downloads.values()))
+
+def _read_meta(dest_path):
+    try:
+        with open(dest_path + META_SUFFIX, "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return {key: value for key, value in meta.items() if value} or None
+
+def _download_one(product, url, dest_path, validators=None):
+    # Write next to the destination and rename into place: a same-directory rename is
+    # atomic and copies nothing, and an interrupted download never looks complete.
+    part_path = dest_path + ".part"
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            logging.info(f"Downloading {product} from {url} (attempt {attempt})...")
+            response = SESSION.get(url, headers=headers, stream=True, timeout=30)
+            if validators and response.status_code == 304:
+                response.close()
+                logging.info(f"{os.path.basename(dest_path)} unchanged on server. Skipping.")
+                return True
+            response.raise_for_status()
+            with open(part_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+            os.replace(part_path, dest_path)
+            _write_meta(dest_path, response)
+            logging.info(f"Saved to {dest_path}")
+            return True
+        except Exception as e:
+            logging.warning(f"Attempt {attempt} failed for {product}: {e}")
             try:
-                logging.info(f"Downloading {product} from {url} (attempt {attempt})...")
-                response = requests.get(url, stream=True, timeout=30)
-                response.raise_for_status()
-                with open(dest_path, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                logging.info(f"Saved to {dest_path}")
-                break
-            except Exception as e:
-                logging.warning(f"Attempt {attempt} failed for {product}: {e}")
-                if attempt < MAX_RETRIES:
-                    time.sleep(RETRY_DELAY * attempt)
-                else:
-                    logging.error(f"Failed to download {url} after {MAX_RETRIES} attempts. This error is usually due to a network/dns issue. Try again.")
+                os.remove(part_path)
+            except OSError:
+                pass
+            if attempt < MAX_RETRIES:
+                time.sleep(RETRY_DELAY * attempt)
+            else:
+                logging.error(f"Failed to download {url} after {MAX_RETRIES} attempts. This error is usually due to a network/dns issue. Try again.")
+    return False
+
+def _write_meta(dest_path, response):
+    meta = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+    meta_path = dest_path + META_SUFFIX
+    try:
+        if meta["etag"] or meta["last_modified"]:
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+        elif os.path.exists(meta_path):
+            os.remove(meta_path)
+    except OSError as e:
+        logging.warning(f"Could not record download metadata for {dest_path}: {e}")
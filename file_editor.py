@@ -1,6 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import os
+import sys
+
+from comparator import clear_baseline_cache
 
 def launch_file_editor(file_path, parent):
     if not file_path or not os.path.exists(file_path):
@@ -29,6 +32,8 @@ def launch_file_editor(file_path, parent):
             new_content = text_box.get("1.0", "end").rstrip()
             with open(file_path, 'w') as f:
                 f.write(new_content)
+            # The edited file may be a baseline the comparator has cached
+            clear_baseline_cache()
             messagebox.showinfo("Success", "File saved successfully.", parent=editor)
             editor.destroy()
         except Exception as e:
@@ -37,7 +42,6 @@ def launch_file_editor(file_path, parent):
     ttk.Button(editor, text="Save", style="Accent.TButton", command=save_file).pack(pady=(0, 12))
 
 def main():
-    import sys
     if len(sys.argv) < 2:
         print("Usage: python3 file_editor.py <file_path>")
         return
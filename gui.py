@@ -2,48 +2,85 @@ import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext
 import logging
 import os
-import yaml
 import sys
 import threading
-import json
+import queue
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 
-from cklb_importer import import_cklb_files
+from cklb_importer import ask_cklb_files, import_cklbs
 from handlers import run_generate_baseline_task, run_compare_task, run_merge_task
-from selected_merger import load_cklb, save_cklb, check_stig_id_match
+from selected_merger import iter_rules, load_cklb, load_cklb_cached, save_cklb, check_stig_id_match
 from reset_baseline import reset_baseline_fields
+from comparator import load_baseline
 from file_editor import launch_file_editor
 from menu_bar import build_menu
 
 # === Logger ===
+LOG_FLUSH_MS = 100  # how often queued log lines are written to the log pane
+
 class GuiLogger(logging.Handler):
+    """Queue log lines from any thread and write them to text_widget from the Tk loop.
+
+    Lines are flushed in one insert and one scroll per LOG_FLUSH_MS, so bursts of log
+    records don't repaint the widget once each, and worker threads never touch Tk.
+    """
     def __init__(self, text_widget):
         super().__init__()
         self.text_widget = text_widget
+        self.pending = queue.SimpleQueue()
+        text_widget.after(LOG_FLUSH_MS, self.flush_pending)
 
     def emit(self, record):
-        msg = self.format(record)
-        self.text_widget.configure(state="normal")
-        self.text_widget.insert(tk.END, msg + '\n')
-        self.text_widget.see(tk.END)
-        self.text_widget.configure(state="disabled")
+        self.write(self.format(record))
+
+    def write(self, msg):
+        self.pending.put(msg)
+
+    def flush_pending(self):
+        lines = []
+        try:
+            while True:
+                lines.append(self.pending.get_nowait())
+        except queue.Empty:
+            pass
+        if lines:
+            self.text_widget.configure(state="normal")
+            self.text_widget.insert(tk.END, '\n'.join(lines) + '\n')
+            self.text_widget.see(tk.END)
+            self.text_widget.configure(state="disabled")
+        self.text_widget.after(LOG_FLUSH_MS, self.flush_pending)
 
 # === Job Status Feedback Helper ===
 def log_job_status(message):
-    log_output.configure(state="normal")
-    log_output.insert(tk.END, message + '\n')
-    log_output.see(tk.END)
-    log_output.configure(state="disabled")
+    # Shares the handler's queue so status lines stay in order with log records
+    log_handler.write(message)
+
+# === Scrollable Frame Helper ===
+def make_scrollable_frame(parent, **canvas_options):
+    """Pack a vertically scrolling canvas into parent and return the frame inside it."""
+    canvas = tk.Canvas(parent, **canvas_options)
+    inner = ttk.Frame(canvas)
+    vsb = ttk.Scrollbar(parent, orient="vertical", command=canvas.yview)
+    canvas.configure(yscrollcommand=vsb.set)
+    vsb.pack(side="right", fill="y")
+    canvas.pack(side="left", fill="both", expand=True)
+    canvas.create_window((0, 0), window=inner, anchor="nw")
+    inner.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+    return inner
 
 # === Modified Button Commands with Feedback ===
+# Scrape mode labels shown in the GUI, in display order, and their internal mode names
+MODE_LABELS = {
+    "SCAP Benchmarks": "benchmark",
+    "Operating Systems": "checklist",
+    "Applications": "application",
+    "Network": "network",
+    "ALL": "all"
+}
+
 def get_internal_mode(mode_label):
-    mapping = {
-        "SCAP Benchmarks": "benchmark",
-        "Operating Systems": "checklist",
-        "Applications": "application",
-        "Network": "network",
-        "ALL": "all"
-    }
-    return mapping.get(mode_label, "benchmark")
+    return MODE_LABELS.get(mode_label, "benchmark")
 
 def run_generate_baseline_with_feedback():
     log_job_status("[INFO] Job started: Generating new baseline...")
@@ -60,9 +97,18 @@ def run_generate_baseline_with_feedback():
     )).start()
 
 def import_cklb_with_feedback():
+    # The dialog belongs to the main window; only the copies run in the background
+    file_paths = ask_cklb_files(parent=root)
+    if not file_paths:
+        logging.info("No files selected.")
+        return
     log_job_status("[INFO] Job started: Importing CKLB library...")
-    threading.Thread(target=lambda: import_cklb_files(on_import_complete=refresh_usr_listbox)).start()
-    log_job_status("[INFO] Job complete: CKLB import finished.")
+    def task():
+        import_cklbs(file_paths)
+        # Tk is only touched from the main thread
+        root.after(0, refresh_usr_listbox)
+        log_job_status("[INFO] Job complete: CKLB import finished.")
+    threading.Thread(target=task).start()
 
 def run_compare_with_feedback():
     log_job_status("[INFO] Job started: Running tasks...")
@@ -94,25 +140,29 @@ def download_cklb_popup():
     cklb_files = sorted(os.listdir(updated_dir)) if os.path.isdir(updated_dir) else []
 
     listbox = tk.Listbox(popup, selectmode=tk.MULTIPLE, font=LABEL_FONT, bg="#f0f4fc", width=60, height=12)
-    for f in cklb_files:
-        listbox.insert(tk.END, f)
+    listbox.insert(tk.END, *cklb_files)
     listbox.pack(padx=18, pady=(0, 18), fill="both", expand=True)
 
     def do_download():
-        selected = [listbox.get(i) for i in listbox.curselection()]
+        names = listbox.get(0, tk.END)
+        selected = [names[i] for i in listbox.curselection()]
         if not selected:
             tk.messagebox.showwarning("No Selection", "Please select at least one CKLB file.")
             return
         dest_dir = filedialog.askdirectory(title="Select Destination Directory")
         if not dest_dir:
             return
-        for fname in selected:
-            src = os.path.join(updated_dir, fname)
-            dst = os.path.join(dest_dir, fname)
+        def copy_one(fname):
+            # copyfile streams in-kernel where it can, rather than reading whole files into memory
             try:
-                with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
-                    fdst.write(fsrc.read())
+                shutil.copyfile(os.path.join(updated_dir, fname), os.path.join(dest_dir, fname))
             except Exception as e:
+                return e
+        # Copies are I/O bound, so overlap them; errors are shown afterwards from the Tk thread
+        with ThreadPoolExecutor(max_workers=min(8, len(selected))) as pool:
+            errors = list(pool.map(copy_one, selected))
+        for fname, e in zip(selected, errors):
+            if e is not None:
                 tk.messagebox.showerror("Copy Error", f"Failed to copy {fname}: {e}")
         tk.messagebox.showinfo("Download Complete", f"Copied {len(selected)} file(s) to {dest_dir}")
         popup.grab_release()
@@ -124,15 +174,14 @@ def download_cklb_popup():
 def run_reset_baseline_with_feedback():
     baseline_path = yaml_path_var.get()
     if not baseline_path or not os.path.exists(baseline_path):
-        tk.messagebox.showerror("File Error", "Please select a valid Baseline YAML file.")
+        tk.messagebox.showerror("File Error", "Please select a valid baseline file.")
         return
-    # Load YAML and get product list
+    # Load baseline and get product list
     try:
-        with open(baseline_path, 'r') as f:
-            data = yaml.safe_load(f)
+        data = load_baseline(baseline_path)
         products = list(data.keys())
     except Exception as e:
-        tk.messagebox.showerror("YAML Error", f"Failed to load baseline: {e}")
+        tk.messagebox.showerror("Baseline Error", f"Failed to load baseline: {e}")
         return
     # Ask user to select products (checkboxes)
     sel_win = tk.Toplevel(root)
@@ -147,16 +196,7 @@ def run_reset_baseline_with_feedback():
     select_all_cb = ttk.Checkbutton(sel_win, text="Select All", variable=select_all_var, command=on_select_all)
     select_all_cb.pack(anchor="w", padx=18)
     # Scrollable frame for checkboxes
-    scroll_canvas = tk.Canvas(sel_win, borderwidth=0, background=sel_win.cget('background'))
-    check_frame = ttk.Frame(scroll_canvas)
-    vsb = ttk.Scrollbar(sel_win, orient="vertical", command=scroll_canvas.yview)
-    scroll_canvas.configure(yscrollcommand=vsb.set)
-    vsb.pack(side="right", fill="y")
-    scroll_canvas.pack(side="left", fill="both", expand=True)
-    scroll_canvas.create_window((0,0), window=check_frame, anchor="nw")
-    def on_frame_configure(event):
-        scroll_canvas.configure(scrollregion=scroll_canvas.bbox("all"))
-    check_frame.bind("<Configure>", on_frame_configure)
+    check_frame = make_scrollable_frame(sel_win, borderwidth=0, background=sel_win.cget('background'))
     prod_vars = []
     for prod in products:
         var = tk.BooleanVar()
@@ -180,16 +220,7 @@ def run_reset_baseline_with_feedback():
         msg_frame.pack(fill="both", expand=True, padx=16, pady=16)
         # Scrollable text for product list
         msg = "This will set 'Release' and 'Version' to '0' for:\n\n" + "\n".join(selected) + "\n\nAre you sure?"
-        text_canvas = tk.Canvas(msg_frame, borderwidth=0, background=confirm_win.cget('background'))
-        text_frame = ttk.Frame(text_canvas)
-        vsb = ttk.Scrollbar(msg_frame, orient="vertical", command=text_canvas.yview)
-        text_canvas.configure(yscrollcommand=vsb.set)
-        vsb.pack(side="right", fill="y")
-        text_canvas.pack(side="left", fill="both", expand=True)
-        text_canvas.create_window((0,0), window=text_frame, anchor="nw")
-        def on_text_frame_configure(event):
-            text_canvas.configure(scrollregion=text_canvas.bbox("all"))
-        text_frame.bind("<Configure>", on_text_frame_configure)
+        text_frame = make_scrollable_frame(msg_frame, borderwidth=0, background=confirm_win.cget('background'))
         # Message label (wrap text)
         msg_label = ttk.Label(text_frame, text=msg, wraplength=440, justify="left", font=LABEL_FONT)
         msg_label.pack(anchor="nw", fill="x", expand=True)
@@ -221,6 +252,9 @@ def run_reset_baseline_with_feedback():
     ttk.Button(btn_frame, text="Cancel", command=on_cancel).pack(side="left", padx=12)
 
 # === New Rule Input Dialog ===
+# CKLB rule status values offered in the dialog
+STATUS_VALUES = ("not_reviewed", "not_applicable", "open", "not_a_finding")
+
 class MultiRuleInputDialog(tk.Toplevel):
     def __init__(self, parent, new_rules, checklist_files):
         super().__init__(parent)
@@ -244,7 +278,7 @@ class MultiRuleInputDialog(tk.Toplevel):
         ttk.Label(bulk_frame, text="Bulk Fill Status:").pack(side="left")
         self.status_bulk = tk.StringVar(value="not_reviewed")
         status_bulk_cb = ttk.Combobox(bulk_frame, textvariable=self.status_bulk,
-            values=["not_reviewed", "not_applicable", "open", "not_a_finding"], state="readonly", width=18)
+            values=STATUS_VALUES, state="readonly", width=18)
         status_bulk_cb.pack(side="left", padx=5)
         ttk.Label(bulk_frame, text="Comment:").pack(side="left")
         self.comment_bulk = tk.StringVar()
@@ -255,14 +289,7 @@ class MultiRuleInputDialog(tk.Toplevel):
         # Scrollable Table
         canvas_frame = ttk.Frame(self)
         canvas_frame.pack(fill="both", expand=True, padx=12)
-        canvas = tk.Canvas(canvas_frame, height=300, bg="#f5f5f5", highlightthickness=0)
-        scroll = ttk.Scrollbar(canvas_frame, orient="vertical", command=canvas.yview)
-        self.table_frame = ttk.Frame(canvas)
-        self.table_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-        canvas.create_window((0, 0), window=self.table_frame, anchor="nw")
-        canvas.config(yscrollcommand=scroll.set)
-        canvas.pack(side="left", fill="both", expand=True)
-        scroll.pack(side="right", fill="y")
+        self.table_frame = make_scrollable_frame(canvas_frame, height=300, bg="#f5f5f5", highlightthickness=0)
 
         # Table Headers
         headers = ["ID", "Rule Title", "Status", "Comment", "Ignore"]
@@ -288,12 +315,11 @@ class MultiRuleInputDialog(tk.Toplevel):
             # Status
             status_var = tk.StringVar(value="not_reviewed")
             status_cb = ttk.Combobox(self.table_frame, textvariable=status_var,
-                values=["not_reviewed", "not_applicable", "open", "not_a_finding"], state="readonly", width=18)
+                values=STATUS_VALUES, state="readonly", width=18)
             status_cb.grid(row=i, column=2, padx=5, pady=2)
             status_cb.configure(background=bg)
 
             # Comment (wrapped to 3 lines)
-            comment_var = tk.StringVar()
             comment_entry = tk.Text(self.table_frame, height=3, width=40, wrap="word", background=bg)
             comment_entry.grid(row=i, column=3, sticky="nsew", padx=5, pady=2)
 
@@ -380,19 +406,23 @@ cklb_sel_var = tk.StringVar()
 # === Refresh Combo Logic ===
 def refresh_cklb_combobox():
     new_cklb_files = sorted(os.listdir(cklb_dir)) if os.path.isdir(cklb_dir) else []
-    cklb_combobox['values'] = new_cklb_files
+    if tuple(new_cklb_files) != tuple(cklb_combobox['values']):
+        cklb_combobox['values'] = new_cklb_files
 
 # === Refresh User CKLB Library ===
 def refresh_usr_listbox():
     usr_files = sorted(os.listdir(usr_dir)) if os.path.isdir(usr_dir) else []
+    # Rebuilding an unchanged list would only redraw it and drop the current selection
+    if tuple(usr_files) == file_listbox.get(0, tk.END):
+        return
     file_listbox.delete(0, tk.END)
-    for f in usr_files:
-        file_listbox.insert(tk.END, f)
+    file_listbox.insert(tk.END, *usr_files)
 
 # === Handler must come after widgets ===
 def update_now_handler():
     # Check for selection errors
-    selected_old_files = [file_listbox.get(i) for i in file_listbox.curselection()]
+    usr_names = file_listbox.get(0, tk.END)
+    selected_old_files = [usr_names[i] for i in file_listbox.curselection()]
     new_name = cklb_sel_var.get()
     if not selected_old_files:
         tk.messagebox.showerror("Selection Error", "Please select at least one CKLB to upgrade.")
@@ -405,9 +435,8 @@ def update_now_handler():
     old_path = os.path.join(usr_dir, selected_old_files[0])
     new_path = os.path.join(cklb_dir, new_name)
     try:
-        old_data = load_cklb(old_path)
-        new_data = load_cklb(new_path)
-        is_match, old_stig_id, new_stig_id, new_rules = check_stig_id_match(old_data, new_data)
+        # Cached parses: the host_name check and the merge reuse them
+        is_match, old_stig_id, new_stig_id, new_rules = check_stig_id_match(load_cklb_cached(old_path), load_cklb_cached(new_path))
         if not is_match:
             msg = (f"The STIG ID of the old checklist does not match the new checklist.\n"
                    f"Old STIG ID: {old_stig_id}\nNew STIG ID: {new_stig_id}\n"
@@ -428,8 +457,7 @@ def update_now_handler():
     for old_name in selected_old_files:
         old_path = os.path.join(usr_dir, old_name)
         try:
-            with open(old_path, "r", encoding="utf-8") as f:
-                old_json = json.load(f)
+            old_json = load_cklb_cached(old_path)
             if not old_json.get("target_data", {}).get("host_name"):
                 needs_prefix = True
                 break
@@ -470,13 +498,14 @@ def update_now_handler():
             user_input = dialog.result
             if user_input:
                 merged_cklb = load_cklb(result["merged_path"])
-                for rule_entry in user_input["rules"]:
-                    for stig in merged_cklb.get("stigs", []):
-                        for rule in stig.get("rules", []):
-                            if rule.get("group_id_src") == rule_entry["group_id_src"]:
-                                rule["status"] = rule_entry["status"]
-                                rule["comments"] = rule_entry["comments"]
-                save_cklb(result["merged_path"], merged_cklb)
+                # One pass over the checklist, looking each rule up in the answers
+                entries = {entry["group_id_src"]: entry for entry in user_input["rules"]}
+                for rule in iter_rules(merged_cklb):
+                    rule_entry = entries.get(rule.get("group_id_src"))
+                    if rule_entry is not None:
+                        rule["status"] = rule_entry["status"]
+                        rule["comments"] = rule_entry["comments"]
+                save_cklb(result["merged_path"], merged_cklb, durable=True)
                 status_text.set(f"Updated {len(user_input['rules'])} new rules in {result['merged_name']}")
     log_job_status("[INFO] Job complete: Merge/update finished.")
 
@@ -520,7 +549,7 @@ top_controls.grid(row=0, column=1, columnspan=2, sticky="nsew", pady=(0, 18), pa
 # Use a single grid for all controls in top_controls for perfect alignment
 scrape_label = ttk.Label(top_controls, text="Scrape Mode:", font=LABEL_FONT)
 scrape_label.grid(row=0, column=0, padx=(0, 10), pady=4, sticky="w")
-scrape_combo = ttk.Combobox(top_controls, textvariable=mode_var, values=["SCAP Benchmarks", "Operating Systems", "Applications", "Network", "ALL"], state="readonly", width=15)
+scrape_combo = ttk.Combobox(top_controls, textvariable=mode_var, values=list(MODE_LABELS), state="readonly", width=15)
 scrape_combo.grid(row=0, column=1, padx=(0, 10), pady=4, sticky="ew")
 
 yaml_label = ttk.Label(top_controls, text="Baseline YAML:", font=LABEL_FONT)
@@ -528,7 +557,7 @@ yaml_label.grid(row=1, column=0, padx=(0, 10), pady=4, sticky="w")
 yaml_entry = ttk.Entry(top_controls, textvariable=yaml_path_var, width=50)
 yaml_entry.grid(row=1, column=1, padx=(0, 10), pady=4, sticky="ew")
 yaml_browse = ttk.Button(top_controls, text="Browse", command=lambda: yaml_path_var.set(
-    filedialog.askopenfilename(filetypes=[("YAML files", "*.yaml")])
+    filedialog.askopenfilename(filetypes=[("Baseline files", "*.yaml *.json"), ("YAML files", "*.yaml"), ("JSON files", "*.json")])
 ))
 yaml_browse.grid(row=1, column=2, padx=(0, 10), pady=4, sticky="w")
 
@@ -600,8 +629,7 @@ cklb_download_btn.pack(fill="x")
 
 # Populate the listbox with files
 file_listbox.delete(0, tk.END)
-for f in usr_files:
-    file_listbox.insert(tk.END, f)
+file_listbox.insert(tk.END, *usr_files)
 
 # === Separator ===
 sep2 = ttk.Separator(frame, orient="horizontal")
@@ -2,18 +2,17 @@ import threading
 import subprocess
 import sys
 import os
-import yaml
-import json
 from datetime import datetime
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from scraper import scrape_stigs
 from baseline_generator import generate_baseline
 from comparator import compare_to_baseline
 from downloader import download_updates
 from xccdf_extractor import extract_xccdf_from_zip
-from cklb_generator import generate_cklb_json
-from selected_merger import find_new_rules, load_cklb, save_cklb
+from cklb_generator import stream_cklb_to_file
+from selected_merger import find_rules_not_in, iter_rules, load_cklb_cached, unique_output_name
 
 def run_generate_baseline_task(mode, on_status_update, clear_log):
     clear_log()
@@ -36,56 +35,28 @@ def run_compare_task(mode, baseline_path, download_updates_checked, extract_chec
     on_status_update("Working... please wait")
 
     if not baseline_path or not os.path.exists(baseline_path):
-        logging.error("Please select a valid YAML file to compare against.")
+        logging.error("Please select a valid baseline file to compare against.")
         on_status_update("Error. Invalid file.")
         return
 
     def task():
         try:
             scraped = scrape_stigs(mode)
-            with open(baseline_path, "r") as f:
-                old_data = yaml.safe_load(f)
-
-            changed_items = []
-            for item in scraped:
-                product = item.get("Product")
-                if product not in old_data:
-                    continue
-                old = old_data[product]
-                if old.get("Version") != item.get("Version") or old.get("Release") != item.get("Release"):
-                    changed_items.append(item)
-
-            compare_to_baseline(scraped, baseline_path)
+            changed_items = compare_to_baseline(scraped, baseline_path)
+            if changed_items is None:
+                on_status_update("Error. Check log output.")
+                return
 
             if download_updates_checked:
                 logging.info(f"Found {len(changed_items)} new/changed items. Starting downloads...")
-                download_updates(changed_items)
-
+                on_downloaded = None
                 if extract_checked:
                     zip_dir = os.path.join("cklb_proc", "xccdf_lib")
                     out_dir = os.path.join("cklb_proc", "cklb_lib")
                     os.makedirs(out_dir, exist_ok=True)
-
-                    for item in changed_items:
-                        zip_name = os.path.basename(item.get("URL", ""))
-                        zip_path = os.path.join(zip_dir, zip_name)
-                        xccdf_paths = extract_xccdf_from_zip(zip_path, zip_dir)
-
-                        if xccdf_paths:
-                            if not isinstance(xccdf_paths, list):
-                                xccdf_paths = [xccdf_paths]
-                            for xccdf_path in xccdf_paths:
-                                try:
-                                    cklb_json = generate_cklb_json(xccdf_path)
-                                    basename = os.path.basename(xccdf_path).replace("-xccdf.xml", "").replace("Manual", "").strip("_- ")
-                                    date_str = datetime.today().strftime("%Y%m%d")
-                                    outfile_name = f"{basename}_{date_str}.cklb"
-                                    outfile = os.path.join(out_dir, outfile_name)
-                                    with open(outfile, 'w') as f:
-                                        json.dump(cklb_json, f, indent=2)
-                                    logging.info(f"Generated checklist: {outfile}")
-                                except Exception as e:
-                                    logging.error(f"Failed to generate checklist from {xccdf_path}: {e}")
+                    # Convert each zip as soon as it lands, while the rest are still downloading
+                    on_downloaded = lambda zip_path: convert_xccdf_zip(zip_path, zip_dir, out_dir)
+                download_updates(changed_items, on_downloaded=on_downloaded)
 
             on_status_update("Done")
             if on_cklb_refresh:
@@ -95,21 +66,47 @@ def run_compare_task(mode, baseline_path, download_updates_checked, extract_chec
             on_status_update("Error. Check log output.")
     threading.Thread(target=task).start()
 
+def convert_xccdf_zip(zip_path, zip_dir, out_dir):
+    """Extract the XCCDF files from a downloaded STIG zip and write a checklist for each.
+
+    Returns the paths of the generated checklists.
+    """
+    outfiles = []
+    xccdf_paths = extract_xccdf_from_zip(zip_path, zip_dir)
+    if not xccdf_paths:
+        return outfiles
+    if not isinstance(xccdf_paths, list):
+        xccdf_paths = [xccdf_paths]
+    date_str = datetime.today().strftime("%Y%m%d")
+    for xccdf_path in xccdf_paths:
+        try:
+            basename = os.path.basename(xccdf_path).replace("-xccdf.xml", "").replace("Manual", "").strip("_- ")
+            outfile_name = f"{basename}_{date_str}.cklb"
+            outfile = os.path.join(out_dir, outfile_name)
+            # Rules go to disk as they are parsed instead of collecting into one dict
+            stream_cklb_to_file(xccdf_path, outfile)
+            logging.info(f"Generated checklist: {outfile}")
+            outfiles.append(outfile)
+        except Exception as e:
+            logging.error(f"Failed to generate checklist from {xccdf_path}: {e}")
+    return outfiles
+
 def run_merge_task(selected_old_files, new_name, usr_dir, cklb_dir, on_status_update, force=False, prefix=None):
     if not selected_old_files or not new_name:
         on_status_update("Select at least one old and one new CKLB file.")
         return []
 
-    merged_results = []
+    new_path = os.path.join(cklb_dir, new_name)
+    if not os.path.isfile(new_path):
+        on_status_update(f"[ERROR] New checklist not found: {new_path}")
+        return []
+    out_dir = os.path.join(os.getcwd(), 'cklb_proc', 'cklb_updated')
+    os.makedirs(out_dir, exist_ok=True)
 
+    jobs = []
     for old_name in selected_old_files:
         old_path = os.path.join(usr_dir, old_name)
-        new_path = os.path.join(cklb_dir, new_name)
-        out_dir = os.path.join(os.getcwd(), 'cklb_proc', 'cklb_updated')
-        os.makedirs(out_dir, exist_ok=True)
-
-        with open(old_path, "r", encoding="utf-8") as f:
-            old_json = json.load(f)
+        old_json = load_cklb_cached(old_path)
         # Determine host_prefix: only use prefix if this file lacks host_name
         host_name = old_json.get("target_data", {}).get("host_name")
         if not host_name:
@@ -119,33 +116,55 @@ def run_merge_task(selected_old_files, new_name, usr_dir, cklb_dir, on_status_up
             host_prefix = prefix
         else:
             host_prefix = host_name
-        # Guarantee uniqueness
-        base = f"{host_prefix}_{new_name}"
-        out_name = base
-        counter = 1
-        while os.path.exists(os.path.join(out_dir, out_name)):
-            out_name = f"{base}_{counter}"
-            counter += 1
-        merged_name = out_name
-        out_path = os.path.join(out_dir, merged_name)
-
-        cmd = [sys.executable, os.path.join(os.getcwd(), 'selected_merger.py'), old_path, new_path, '-o', out_path]
-        if not host_name and prefix:
-            cmd.extend(['--prefix', prefix])
-        if force:
-            cmd.append('--force')
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            logging.info(result.stdout.strip())
-        except subprocess.CalledProcessError as e:
-            logging.error(e.stderr.strip())
-            continue
-
-        from selected_merger import find_new_rules
-        old_cklb = load_cklb(old_path)
-        merged_cklb = load_cklb(out_path)
-        new_rules = find_new_rules(old_cklb, merged_cklb)
-        merged_results.append({"merged_path": out_path, "merged_name": merged_name, "new_rules": new_rules})
+        cmd_prefix = prefix if not host_name and prefix else None
+        jobs.append((old_path, new_path, out_dir, f"{host_prefix}_{new_name}", cmd_prefix))
+
+    # Each merge is an independent subprocess, so run them concurrently. Jobs that share an
+    # output name stay on one worker so their _1, _2... suffixes are assigned in order.
+    groups = {}
+    for idx, job in enumerate(jobs):
+        groups.setdefault(job[3], []).append(idx)
+    outcomes = [None] * len(jobs)
+
+    def merge_group(indices):
+        for idx in indices:
+            outcomes[idx] = _merge_one(*jobs[idx], force=force)
+
+    with ThreadPoolExecutor(max_workers=min(8, len(groups))) as pool:
+        list(pool.map(merge_group, groups.values()))
+
+    # Log from the calling thread, in selection order
+    merged_results = []
+    for result, ok, message in outcomes:
+        if ok:
+            logging.info(message)
+            merged_results.append(result)
+        else:
+            logging.error(message)
 
     on_status_update("Merge complete.")
-    return merged_results
\ No newline at end of file
+    return merged_results
+
+def _merge_one(old_path, new_path, out_dir, base, prefix, force):
+    """Merge one old checklist into new_path. Returns (result, ok, message) for the caller to log."""
+    # Guarantee uniqueness
+    merged_name = unique_output_name(out_dir, base)
+    out_path = os.path.join(out_dir, merged_name)
+
+    cmd = [sys.executable, os.path.join(os.getcwd(), 'selected_merger.py'), old_path, new_path, '-o', out_path]
+    if prefix:
+        cmd.extend(['--prefix', prefix])
+    if force:
+        cmd.append('--force')
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError as e:
+        return None, False, e.stderr.strip()
+
+    # The merge only rewrites per-rule review fields, so the rules it added are the new
+    # checklist's rules missing from the old one. Both parses are already cached (the old
+    # one by the host_name check, the new one once for the whole batch), so the merged
+    # output isn't read back.
+    old_gids = {rule.get("group_id_src") for rule in iter_rules(load_cklb_cached(old_path))}
+    new_rules = find_rules_not_in(old_gids, load_cklb_cached(new_path))
+    return {"merged_path": out_path, "merged_name": merged_name, "new_rules": new_rules}, True, result.stdout.strip()
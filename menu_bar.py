@@ -1,6 +1,5 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, Toplevel, Frame, Listbox, Scrollbar, Button, MULTIPLE, END
-import yaml, json
 import os
 import subprocess
 
@@ -18,10 +17,10 @@ def open_directory_frame(parent, dir_path, editor_cmd):
     listbox.pack(side='left', fill='both', expand=True)
     scrollbar.config(command=listbox.yview)
 
-    # Populate listbox
-    files = [f for f in os.listdir(dir_path) if os.path.isfile(os.path.join(dir_path, f))]
-    for f in files:
-        listbox.insert(END, f)
+    # Populate listbox; scandir's entries know their type, so no stat per file
+    with os.scandir(dir_path) as it:
+        files = [entry.name for entry in it if entry.is_file()]
+    listbox.insert(END, *files)
 
     # Button actions
     def delete_selected():
@@ -31,8 +30,9 @@ def open_directory_frame(parent, dir_path, editor_cmd):
             return
         confirm = messagebox.askyesno("Confirm Delete", f"Delete {len(sel)} file(s)?")
         if confirm:
+            names = listbox.get(0, END)
             for idx in reversed(sel):
-                fname = listbox.get(idx)
+                fname = names[idx]
                 try:
                     os.remove(os.path.join(dir_path, fname))
                     listbox.delete(idx)
@@ -51,12 +51,14 @@ def open_directory_frame(parent, dir_path, editor_cmd):
         cwd = os.path.dirname(os.path.abspath(__file__))
         try:
             proc = subprocess.Popen(cmd, cwd=cwd)
-            import time
-            time.sleep(0.5)
-            if proc.poll() is not None:
-                messagebox.showerror("Error", f"Editor process exited immediately.\nCommand: {cmd}\nCheck if file_editor.py runs standalone.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open editor: {e}\nCommand: {cmd}")
+        else:
+            # Check on the editor later instead of sleeping, which would freeze the GUI
+            def check_editor():
+                if proc.poll() is not None:
+                    messagebox.showerror("Error", f"Editor process exited immediately.\nCommand: {cmd}\nCheck if file_editor.py runs standalone.")
+            parent.after(500, check_editor)
         win.destroy()
 
     def cancel():
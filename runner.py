@@ -1,15 +1,8 @@
 import os
 import argparse
 import logging
-import yaml
-import json
-from datetime import datetime
-from scraper import scrape_stigs
-from comparator import compare_to_baseline
-from baseline_generator import generate_baseline
-from downloader import download_updates
-from xccdf_extractor import extract_xccdf_from_zip
-from cklb_generator import generate_cklb_json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 # === Setup paths ===
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,7 +10,7 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 # === Setup argument parser ===
 parser = argparse.ArgumentParser(description="DISA STIG Scraper and Baseline Manager")
 parser.add_argument('--mode', choices=['benchmark', 'checklist', 'application', 'network', 'all'], required=True, help='Which type of STIGs to scrape')
-parser.add_argument('--yaml', required=False, help='Baseline YAML file to compare against (optional)')
+parser.add_argument('--yaml', required=False, help='Baseline YAML or JSON file to compare against (optional)')
 parser.add_argument('--log', choices=['terminal', 'file'], default='terminal', help='Log to terminal or file')
 parser.add_argument('--generate-baseline', action='store_true', help='Generate a new baseline YAML instead of comparing')
 parser.add_argument('--print-urls', action='store_true', help='Print download URLs and exit')
@@ -49,20 +42,25 @@ else:
     )
 
 # === Main Logic ===
+# Modules below are imported in the branch that uses them, so each mode only pays
+# for what it runs (requests/bs4, yaml, lxml and the checklist tooling are not cheap).
 def main():
-    scraped_items = scrape_stigs(mode=args.mode)
-
     if args.import_cklb:
+        # Importing needs nothing from the scrape
         from cklb_importer import import_cklb_files
         import_cklb_files()
         return
 
+    from scraper import scrape_stigs
+    scraped_items = scrape_stigs(mode=args.mode)
+
     if args.print_urls:
         for item in scraped_items:
             print(item['URL'])
         return
 
     if args.generate_baseline:
+        from baseline_generator import generate_baseline
         # Generate a new baseline file
         baseline_folder = os.path.join(script_dir, "baselines")
         os.makedirs(baseline_folder, exist_ok=True)
@@ -87,57 +85,36 @@ def main():
             logging.error("You must provide a --yaml baseline to compare against.")
             return
         baseline_path = os.path.join(script_dir, args.yaml)
+        from comparator import compare_to_baseline
 
-        # Load baseline
-        try:
-            with open(baseline_path, "r") as f:
-                old_data = yaml.safe_load(f)
-        except Exception as e:
-            logging.error(f"Could not load baseline file: {e}")
+        # Perform comparison, collecting changed items, and optionally download
+        changed_items = compare_to_baseline(scraped_items, baseline_path)
+        if changed_items is None:
             return
 
-        # Collect changed items
-        changed_items = []
-        for item in scraped_items:
-            product = item["Product"]
-            if product not in old_data:
-                continue
-            old = old_data[product]
-            if old.get("Version") != item.get("Version") or old.get("Release") != item.get("Release"):
-                changed_items.append(item)
-
-        # Perform comparison and optionally download
-        compare_to_baseline(scraped_items, baseline_path)
-
         if args.download_updates:
+            from downloader import download_updates
             logging.info(f"Found {len(changed_items)} new/changed items. Starting downloads...")
-            download_updates(changed_items)
-
-            if args.extract_xccdf:
-                zip_dir = os.path.join(script_dir, "cklb_proc", "xccdf_lib")
-                cklb_out_dir = os.path.join(script_dir, "cklb_proc", "cklb_lib")
-                os.makedirs(cklb_out_dir, exist_ok=True)
-
-                for item in changed_items:
-                    url = item.get("URL")
-                    if not url:
-                        continue
-                    zip_name = os.path.basename(url)
-                    zip_path = os.path.join(zip_dir, zip_name)
-                    xccdf_path = extract_xccdf_from_zip(zip_path, zip_dir)
-
-                    if xccdf_path:
-                        try:
-                            cklb_json = generate_cklb_json(xccdf_path)
-                            basename = os.path.basename(xccdf_path).replace("-xccdf.xml", "").replace("Manual", "").strip("_-")
-                            date_str = datetime.today().strftime("%Y%m%d")
-                            outfile_name = f"{basename}_{date_str}.cklb"
-                            outfile = os.path.join(cklb_out_dir, outfile_name)
-                            with open(outfile, 'w') as f:
-                                json.dump(cklb_json, f, indent=2)
-                            logging.info(f"Generated checklist: {outfile}")
-                        except Exception as e:
-                            logging.error(f"Failed to generate checklist from {xccdf_path}: {e}")
+            zip_dir = os.path.join(script_dir, "cklb_proc", "xccdf_lib")
+            if not args.extract_xccdf:
+                download_updates(changed_items, zip_dir)
+                return
+
+            from handlers import convert_xccdf_zip
+            cklb_out_dir = os.path.join(script_dir, "cklb_proc", "cklb_lib")
+            os.makedirs(cklb_out_dir, exist_ok=True)
+            # Convert each zip as soon as it lands, while the rest are still downloading.
+            # XML parsing is CPU bound, so conversions run in worker processes; spawn rather
+            # than fork, since the pool is started from the download threads.
+            futures = []
+            with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as pool:
+                download_updates(changed_items, zip_dir, lambda zip_path: futures.append(
+                    pool.submit(convert_xccdf_zip, zip_path, zip_dir, cklb_out_dir)))
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logging.error(f"Checklist conversion failed: {e}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,9 +1,14 @@
 import os
 import re
+import time
 import logging
+import functools
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
 
 # === Constants ===
 SCAP_URL = "https://public.cyber.mil/stigs/downloads/?_dl_facet_stigs=scap"
@@ -11,11 +16,33 @@ OS_URL = "https://public.cyber.mil/stigs/downloads/?_dl_facet_stigs=operating-sy
 APP_URL = "https://public.cyber.mil/stigs/downloads/?_dl_facet_stigs=app-security"
 NET_URL = "https://public.cyber.mil/stigs/downloads/?_dl_facet_stigs=network-perimeter-wireless"
 
+# Version/release patterns used in DISA titles and file names
+V_R_RE = re.compile(r'_V(\d+)[Rr](\d+)')
+Y_M_RE = re.compile(r'_Y(\d{2})M(\d{2})')
+VERSION_RELEASE_RE = re.compile(r'Version[\s_]?Y(\d{2})[\s_]?Release[\s_]?M(\d{2})', re.IGNORECASE)
+# Updated dates shown next to download links, e.g. "12 March 2024"
+DATE_RE = re.compile(r'(\d{1,2} [A-Za-z]{3,9} \d{4})')
+# Download links on the listing pages
+ZIP_HREF_RE = re.compile(r'\.zip\Z', re.IGNORECASE)
+
 # User-Agent header to mimic a browser request
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; STIGCheckerBot/1.0; +https://example.com/bot)"
 }
 
+# One pooled session for all requests to DISA, so page fetches and downloads reuse
+# TCP/TLS connections. Retries stay with the callers' own retry loops.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+# Listing pages fetched within this many seconds are reused without a request
+PAGE_CACHE_TTL = 300
+# url -> (fetched_at, text, etag, last_modified)
+_page_cache = {}
+_page_cache_lock = threading.Lock()
+
 # Configure logging
 LOG_DIR = os.path.join(os.path.dirname(__file__), "logs")
 if not os.path.exists(LOG_DIR):
@@ -28,38 +55,69 @@ logging.basicConfig(
     level=logging.INFO
 )
 
-def fetch_page(url):
-    """Fetch the webpage content."""
+def fetch_page(url, force=False):
+    """Fetch the webpage content.
+
+    Pages are cached for PAGE_CACHE_TTL seconds; after that (or with force=True) the page
+    is revalidated with its ETag/Last-Modified and the cached text reused on a 304.
+    """
+    with _page_cache_lock:
+        cached = _page_cache.get(url)
+    if cached and not force and time.monotonic() - cached[0] < PAGE_CACHE_TTL:
+        return cached[1]
+
+    headers = {}
+    if cached:
+        if cached[2]:
+            headers["If-None-Match"] = cached[2]
+        if cached[3]:
+            headers["If-Modified-Since"] = cached[3]
     try:
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        response.raise_for_status()
-        logging.info(f"Fetched page: {url}")
-        return response.text
+        response = SESSION.get(url, headers=headers, timeout=30)
+        if cached and response.status_code == 304:
+            text = cached[1]
+            # A 304 need not repeat the validators; keep the cached ones unless it sends new ones
+            etag = response.headers.get("ETag") or cached[2]
+            last_modified = response.headers.get("Last-Modified") or cached[3]
+            logging.info(f"Page not modified: {url}")
+        else:
+            response.raise_for_status()
+            text = response.text
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            logging.info(f"Fetched page: {url}")
     except Exception as e:
         logging.error(f"Failed to fetch page {url}: {e}")
         raise
+    with _page_cache_lock:
+        _page_cache[url] = (time.monotonic(), text, etag, last_modified)
+    return text
 
-def scrape_page(url: str, mode_filter: str = None) -> list:
-    """Scrape a single page and return filtered rows using robust link search."""
-    html_content = fetch_page(url)
+@functools.lru_cache(maxsize=8)
+def _parse_zip_links(url, html_content):
+    """Return (file_url, title, updated) for each .zip link; cached so unchanged pages aren't re-parsed."""
     soup = BeautifulSoup(html_content, "html.parser")
     rows = []
-    for link in soup.find_all("a", href=True):
+    for link in soup.find_all("a", href=ZIP_HREF_RE):
         href = link["href"]
-        if href.lower().endswith(".zip"):
-            file_url = urljoin(url, href)
-            title = link.text.strip() or os.path.basename(href)
-            # Try to find a nearby date (if available)
-            updated = "Unknown"
-            parent = link.find_parent()
-            if parent:
-                # Look for a sibling or parent with a date string
-                text = parent.get_text(" ", strip=True)
-                m = re.search(r'(\d{1,2} [A-Za-z]{3,9} \d{4})', text)
-                if m:
-                    updated = m.group(1)
-            rows.append([file_url, title, updated])
-            logging.info(f"Found file link: {title} -> {file_url} (updated: {updated})")
+        file_url = urljoin(url, href)
+        title = link.text.strip() or os.path.basename(href)
+        # Try to find a nearby date (if available)
+        updated = "Unknown"
+        parent = link.find_parent()
+        if parent:
+            # Look for a sibling or parent with a date string
+            text = parent.get_text(" ", strip=True)
+            m = DATE_RE.search(text)
+            if m:
+                updated = m.group(1)
+        rows.append((file_url, title, updated))
+        logging.info(f"Found file link: {title} -> {file_url} (updated: {updated})")
+    return tuple(rows)
+
+def scrape_page(url: str, mode_filter: str = None) -> list:
+    """Scrape a single page and return filtered rows using robust link search."""
+    rows = [list(row) for row in _parse_zip_links(url, fetch_page(url))]
     if not rows:
         logging.warning(f"No downloadable .zip file links found on page: {url}")
         print(f"[DEBUG] No downloadable .zip file links found on page: {url}")
@@ -82,28 +140,34 @@ def scrape_stigs(mode: str, headful: bool = False) -> list:
     if mode in ['network', 'all']:
         urls_to_scrape.append((NET_URL, 'network' if mode != 'all' else None))
 
-    # Scrape each URL
-    for url, mode_filter in urls_to_scrape:
+    def scrape(job):
+        url, mode_filter = job
         try:
-            filtered_rows = scrape_page(url, mode_filter)
-            all_filtered_rows.extend(filtered_rows)
+            return scrape_page(url, mode_filter)
         except Exception as e:
             logging.error(f"Failed to scrape {url}: {e}")
-            continue
+            return []
+
+    # Fetch the pages concurrently; rows are still collected in page order
+    with ThreadPoolExecutor(max_workers=len(urls_to_scrape) or 1) as pool:
+        for filtered_rows in pool.map(scrape, urls_to_scrape):
+            all_filtered_rows.extend(filtered_rows)
 
     return parse_rows(all_filtered_rows)
 
 def extract_version_release_from_filename(file_name):
     # Try V#R# pattern (e.g., V2R1)
-    m = re.search(r'_V(\d+)[Rr](\d+)', file_name)
-    if m:
-        return m.group(1), m.group(2)
+    if '_V' in file_name:
+        m = V_R_RE.search(file_name)
+        if m:
+            return m.group(1), m.group(2)
     # Try Y##M## pattern (e.g., Y25M04)
-    m = re.search(r'_Y(\d{2})M(\d{2})', file_name)
-    if m:
-        return f"Y{m.group(1)}", f"M{m.group(2)}"
+    if '_Y' in file_name:
+        m = Y_M_RE.search(file_name)
+        if m:
+            return f"Y{m.group(1)}", f"M{m.group(2)}"
     # Try Version Y## Release M##
-    m = re.search(r'Version[\s_]?Y(\d{2})[\s_]?Release[\s_]?M(\d{2})', file_name, re.IGNORECASE)
+    m = VERSION_RELEASE_RE.search(file_name)
     if m:
         return f"Y{m.group(1)}", f"M{m.group(2)}"
     return None, None
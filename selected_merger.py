@@ -1,12 +1,34 @@
 import json
 import argparse
 import sys
+import functools
+from itertools import chain
+import mmap
 from copy import deepcopy
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Per-rule fields carried from the old checklist into the upgraded one
+CARRIED_FIELDS = ("status", "comments", "finding_details")
+
+# Below this size reading into a bytes buffer is cheaper than setting up an mmap
+MMAP_MIN_BYTES = 64 << 10
+
+def iter_rules(data):
+    """Iterate over every rule of every STIG in a loaded checklist."""
+    return chain.from_iterable(stig.get("rules", ()) for stig in data.get("stigs", ()))
+
 def find_new_rules(old_data, new_data):
     """Return a list of new rule dicts (group_id_src, rule_title, stig uuid, stig display_name)."""
-    old_gids = {rule.get("group_id_src") for stig in old_data.get("stigs", []) for rule in stig.get("rules", [])}
+    old_gids = {rule.get("group_id_src") for rule in iter_rules(old_data)}
+    return find_rules_not_in(old_gids, new_data)
+
+def find_rules_not_in(old_gids, new_data):
+    """Same as find_new_rules, for callers that already have the old checklist's group_id_src set."""
     new_rules = []
     for stig in new_data.get("stigs", []):
         for rule in stig.get("rules", []):
@@ -20,20 +42,135 @@ def find_new_rules(old_data, new_data):
                 })
     return new_rules
 
+def _stig_id(data):
+    """Return the first STIG's stig_id, or "UNKNOWN" if there is none."""
+    stigs = data.get("stigs")
+    return stigs[0].get("stig_id", "UNKNOWN") if stigs else "UNKNOWN"
+
 def check_stig_id_match(old_data, new_data):
     """Return (is_match, old_stig_id, new_stig_id, new_rules)"""
-    old_stig_id = old_data.get("stigs", [{}])[0].get("stig_id", "UNKNOWN") if old_data.get("stigs") else "UNKNOWN"
-    new_stig_id = new_data.get("stigs", [{}])[0].get("stig_id", "UNKNOWN") if new_data.get("stigs") else "UNKNOWN"
+    old_stig_id = _stig_id(old_data)
+    new_stig_id = _stig_id(new_data)
     new_rules = find_new_rules(old_data, new_data)
     return old_stig_id == new_stig_id, old_stig_id, new_stig_id, new_rules
 
 def load_cklb(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        # orjson parses straight from the page cache, without a heap copy of the file
+        if orjson and os.fstat(f.fileno()).st_size >= MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+        raw = f.read()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+@functools.lru_cache(maxsize=32)
+def _load_cklb_cached(path, mtime_ns, size):
+    return load_cklb(path)
+
+def load_cklb_cached(path):
+    """Like load_cklb, but reuses the previous parse while the file's mtime and size are unchanged.
+
+    The returned dict is shared between callers and must not be modified; use load_cklb
+    when the checklist is going to be edited and saved.
+    """
+    st = os.stat(path)
+    return _load_cklb_cached(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+def unique_output_name(out_dir, base):
+    """Return base, or base_1, base_2... whichever is first free in out_dir."""
+    # One directory read instead of an exists() probe per taken suffix
+    try:
+        existing = set(os.listdir(out_dir))
+    except FileNotFoundError:
+        existing = set()
+    out_name = base
+    counter = 1
+    while out_name in existing:
+        out_name = f"{base}_{counter}"
+        counter += 1
+    return out_name
 
-def save_cklb(path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+def merge_cklb_data(old_data, new_data, copy=True):
+    """Carry reviewed fields and host metadata from old_data into new_data's rules.
+
+    Returns (merged, updated, added): the merged checklist, how many rules took old
+    values, and (group_id, rule_title) for rules the old checklist lacked. With
+    copy=False new_data itself becomes the merged checklist, saving a full copy when
+    the caller has no further use for it.
+    """
+    # Keep only what the merge carries over
+    old_lookup = {}
+    for rule in iter_rules(old_data):
+        gid = rule.get("group_id_src")
+        if gid:
+            old_es = rule.get("evaluate-stig")
+            old_lookup[gid] = (
+                {field: rule[field] for field in CARRIED_FIELDS if field in rule},
+                (old_es.get("old_status", ""), old_es.get("new_status", "")) if old_es is not None else None,
+            )
+    old_meta = {key: old_data[key] for key in ("target_data", "cklb_version") if key in old_data}
+
+    if not copy:
+        merged = new_data
+    elif orjson:
+        # Checklists are plain JSON data, and an orjson round trip is far cheaper than deepcopy
+        merged = orjson.loads(orjson.dumps(new_data))
+    else:
+        merged = deepcopy(new_data)
+    updated, added = 0, []
+
+    for rule in iter_rules(merged):
+        gid = rule.get("group_id_src")
+        if gid in old_lookup:
+            old_fields, old_es_status = old_lookup[gid]
+            for field in CARRIED_FIELDS:
+                rule[field] = old_fields.get(field, rule.get(field))
+            if "evaluate-stig" in rule and old_es_status is not None:
+                rule["evaluate-stig"]["old_status"], rule["evaluate-stig"]["new_status"] = old_es_status
+            updated += 1
+        else:
+            added.append((gid, rule.get("rule_title", "UNKNOWN TITLE")))
+
+    # Preserve host metadata and versioning
+    merged.update(old_meta)
+
+    # Remove invalid top-level fields
+    merged.pop("evaluate-stig", None)
+    return merged, updated, added
+
+def save_cklb(path, data, pretty=True, durable=False):
+    """Write a checklist as JSON, indented unless pretty is False.
+
+    Compact output is smaller and quicker to write; use it for files only tools will read.
+    The file is written alongside path and renamed over it, so readers never see a partial
+    checklist. durable=True also fsyncs before the rename, for saves that must survive a
+    crash (e.g. the user's answers); it costs a disk flush, so batch writes leave it off.
+    """
+    if orjson:
+        # orjson serializes straight to UTF-8 bytes
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2) if pretty else orjson.dumps(data)
+    elif pretty:
+        payload = json.dumps(data, indent=2).encode("utf-8")
+    else:
+        payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    part_path = path + ".part"
+    try:
+        with open(part_path, "wb") as f:
+            f.write(payload)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(part_path, path)
+    except BaseException:
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+        raise
+    finally:
+        # Writes normally change mtime, but coarse timestamps can miss a same-size rewrite
+        _load_cklb_cached.cache_clear()
 
 def main():
     parser = argparse.ArgumentParser(description="Merge old CKLB data into new CKLB file")
@@ -42,6 +179,7 @@ def main():
     parser.add_argument("-o", "--output", default="merged.cklb", help="Output path for merged CKLB")
     parser.add_argument("--force", action="store_true", help="Proceed even if STIG IDs do not match")
     parser.add_argument("--prefix", help="Manual host‐name prefix (overrides target_data.host_name)")
+    parser.add_argument("--compact", action="store_true", help="Write the merged CKLB without indentation (smaller, faster)")
     args = parser.parse_args()
 
     old_data = load_cklb(args.old_cklb)
@@ -54,64 +192,27 @@ def main():
         print(f"ERROR: {msg}")
         sys.exit(2)
 
-    old_lookup = {}
-    for stig in old_data.get("stigs", []):
-        for rule in stig.get("rules", []):
-            gid = rule.get("group_id_src")
-            if gid:
-                old_lookup[gid] = rule
-
-    merged = deepcopy(new_data)
-    updated, added = 0, []
-
-    for stig in merged.get("stigs", []):
-        for rule in stig.get("rules", []):
-            gid = rule.get("group_id_src")
-            if gid in old_lookup:
-                old = old_lookup[gid]
-                rule["status"] = old.get("status", rule.get("status"))
-                rule["comments"] = old.get("comments", rule.get("comments"))
-                rule["finding_details"] = old.get("finding_details", rule.get("finding_details"))
-                if "evaluate-stig" in rule and "evaluate-stig" in old:
-                    rule["evaluate-stig"]["old_status"] = old["evaluate-stig"].get("old_status", "")
-                    rule["evaluate-stig"]["new_status"] = old["evaluate-stig"].get("new_status", "")
-                updated += 1
-            else:
-                added.append((gid, rule.get("rule_title", "UNKNOWN TITLE")))
-
-    # Preserve host metadata and versioning
-    if "target_data" in old_data:
-        merged["target_data"] = old_data["target_data"]
-    if "cklb_version" in old_data:
-        merged["cklb_version"] = old_data["cklb_version"]
-
-    # Remove invalid top-level fields
-    merged.pop("evaluate-stig", None)
-
     # Determine host_prefix for output naming
     host_prefix = args.prefix or old_data.get("target_data", {}).get("host_name")
+
+    # Nothing else uses new_data, so merge into it rather than copying it
+    merged, updated, added = merge_cklb_data(old_data, new_data, copy=False)
+    del old_data, new_data
+
     if not host_prefix:
         host_prefix = os.path.splitext(os.path.basename(args.old_cklb))[0]
         print(f"WARNING: No host_name found – defaulting to '{host_prefix}'")
     # Guarantee uniqueness in output directory
     out_dir = os.path.dirname(os.path.abspath(args.output))
     new_name = os.path.basename(args.new_cklb)
-    base = f"{host_prefix}_{new_name}"
-    out_name = base
-    counter = 1
-    while os.path.exists(os.path.join(out_dir, out_name)):
-        out_name = f"{base}_{counter}"
-        counter += 1
-    merged_output_path = os.path.join(out_dir, out_name)
+    merged_output_path = os.path.join(out_dir, unique_output_name(out_dir, f"{host_prefix}_{new_name}"))
 
-    save_cklb(merged_output_path, merged)
+    save_cklb(merged_output_path, merged, pretty=not args.compact)
 
     print(f"Merged {updated} rules from old checklist.")
     print(f"Output: {merged_output_path}")
     if added:
-        print("New rules in the updated checklist:")
-        for gid, title in added:
-            print(f"  {gid}: {title}")
+        print("New rules in the updated checklist:\n" + "\n".join(f"  {gid}: {title}" for gid, title in added))
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,13 @@
 import os
+import shutil
 import zipfile
 import logging
 
+from constants import META_SUFFIX
+
+# Chunk size for streaming members out of the archive
+COPY_BUFFER = 1 << 20
+
 def extract_xccdf_from_zip(zip_path: str, output_dir: str = "cklb_proc/xccdf_lib"):
     """
     Extracts any file matching '*-xccdf.xml' from a ZIP archive into the output directory,
@@ -14,20 +20,25 @@ def extract_xccdf_from_zip(zip_path: str, output_dir: str = "cklb_proc/xccdf_lib
     os.makedirs(output_dir, exist_ok=True)
     try:
         with zipfile.ZipFile(zip_path, 'r') as zf:
-            matching = [f for f in zf.namelist() if f.endswith("-xccdf.xml")]
+            # infolist() is the archive's own list; namelist() builds a new one from it
+            matching = [info for info in zf.infolist() if info.filename.endswith("-xccdf.xml")]
             if not matching:
                 logging.warning(f"No '-xccdf.xml' file found in {zip_path}")
                 return None
 
             extracted_paths = []
             for xccdf_file in matching:
-                logging.info(f"Extracting {xccdf_file} from {os.path.basename(zip_path)}")
-                out_path = os.path.join(output_dir, os.path.basename(xccdf_file))
+                logging.info(f"Extracting {xccdf_file.filename} from {os.path.basename(zip_path)}")
+                out_path = os.path.join(output_dir, os.path.basename(xccdf_file.filename))
+                # Stream in chunks rather than holding the whole decompressed member in memory
                 with zf.open(xccdf_file) as source, open(out_path, 'wb') as target:
-                    target.write(source.read())
+                    shutil.copyfileobj(source, target, COPY_BUFFER)
                 extracted_paths.append(out_path)
 
         os.remove(zip_path)
+        # Drop the download's revalidation sidecar along with it
+        if os.path.exists(zip_path + META_SUFFIX):
+            os.remove(zip_path + META_SUFFIX)
         logging.info(f"Deleted original ZIP: {os.path.basename(zip_path)}")
         return extracted_paths
     except Exception as e: